@@ -1,24 +1,19 @@
 import streamlit as st
-import pandas as pd
 
-from cfModel import run_solar_model, PROJECT_YEARS
+from cfModel import get_states, run_solar_model, PROJECT_YEARS
 
 st.set_page_config(page_title="Solar Project Model", layout="wide")
 
 st.title("Solar Project Financial Model")
 st.caption("25 year cash flows, IRR, and payback period.")
 
-# Load states for drodpown
-@st.cache_data
-def load_states() -> list[str]:
-    df = pd.read_csv("energy_prices.csv")
-    if "state" not in df.columns:
-        raise ValueError("energy_prices.csv must include a 'state' column")
-    # duplicates
-    states = sorted(df["state"].astype(str).unique().tolist())
-    return states
+# Load states for drodpown (the price table is cached in cfModel)
+states = get_states()
 
-states = load_states()
+# Memoize model runs so reruns from unrelated widget changes skip recomputation
+@st.cache_data(show_spinner=False, max_entries=128)
+def cached_run(state: str, system_size_kw: float, years: int) -> dict:
+    return run_solar_model(state=state, system_size_kw=system_size_kw, years=years)
 
 # Sidebar inputs 
 st.sidebar.header("Inputs")
@@ -29,7 +24,7 @@ years = st.sidebar.slider("Project horizon (years)", min_value=5, max_value=PROJ
 
 # run the model 
 try:
-    results = run_solar_model(state=state, system_size_kw=system_size_kw, years=years)
+    results = cached_run(state, system_size_kw, years)
     table = results["cashflow_table"]
 
     # Headline metrics
@@ -55,7 +50,7 @@ try:
 
     # Quick chart 
     st.subheader("Cumulative cash flow over time")
-    chart_df = table[["year", "cumulative_cashflow"]].copy()
+    chart_df = table[["year", "cumulative_cashflow"]]
     st.line_chart(chart_df, x="year", y="cumulative_cashflow")
 
 except Exception as e:
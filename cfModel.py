@@ -1,16 +1,21 @@
 # model.py
 from __future__ import annotations
+import functools
+import math
 from dataclasses import dataclass
 from typing import Optional, Dict, Any, Tuple
 
+import numpy as np
 import pandas as pd
-import numpy_financial as npf
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the NumPy kernel
+    njit = None
 
 
 # Configuration 
 
-_ELECTRICITY_PRICE_DF = pd.read_csv("energy_prices.csv")
-_ELECTRICITY_PRICE_DF["state"] = _ELECTRICITY_PRICE_DF["state"].astype(str).str.lower()
 PROJECT_YEARS: int = 25
 CAPEX_PER_WATT: float = 2.50        
 ITC_RATE: float = 0.30               
@@ -21,21 +26,46 @@ OM_PER_KW_YEAR: float = 15.0
 
 # Data 
 
-def get_electricity_price(state: str) -> float:
+@functools.lru_cache(maxsize=1)
+def _load_prices() -> Tuple[Tuple[str, ...], Dict[str, float]]:
     """
-    Returns electricity price ($/kWh) for a given state
+    Reads the price CSV once and returns (sorted states, price by lowercase state)
+    Cached per process, so all Streamlit sessions share one copy
     """
     required_cols = {"state", "cost_per_kWh"}
-    if not required_cols.issubset(_ELECTRICITY_PRICE_DF.columns):
+    df = pd.read_csv(
+        "energy_prices.csv",
+        usecols=lambda c: c in required_cols,
+        dtype={"state": str, "cost_per_kWh": np.float64},
+    )
+    if not required_cols.issubset(df.columns):
         raise ValueError("CSV must contain 'state' and 'cost_per_kWh' columns")
 
-    state_clean = state.lower()
-    match = _ELECTRICITY_PRICE_DF.loc[_ELECTRICITY_PRICE_DF["state"] == state_clean, "cost_per_kWh"]
+    df = df.dropna(subset=["state"])  # a blank state cell must not break every lookup
 
-    if match.empty:
-        raise ValueError(f"State '{state}' not found in price table")
+    state_col = df["state"].tolist()
+    states = tuple(sorted(set(state_col)))
+    prices: Dict[str, float] = {}
+    for s, p in zip(state_col, df["cost_per_kWh"].tolist()):
+        prices.setdefault(s.lower(), p)  # first row wins for duplicated states
+    return states, prices
 
-    return float(match.iloc[0])
+
+def get_states() -> list[str]:
+    """
+    Returns the sorted list of states in the price table
+    """
+    return list(_load_prices()[0])
+
+
+def get_electricity_price(state: str) -> float:
+    """
+    Returns electricity price ($/kWh) for a given state
+    """
+    try:
+        return _load_prices()[1][state.lower()]
+    except KeyError:
+        raise ValueError(f"State '{state}' not found in price table") from None
 
 # Core calculations
 
@@ -87,6 +117,60 @@ def annual_om_cost(system_size_kw: float, om_per_kw_year: float = OM_PER_KW_YEAR
 
 # Cash flow schedule and metrics
 
+@functools.lru_cache(maxsize=8)
+def _price_factors(n: int, esc: float) -> np.ndarray:
+    """
+    Returns read-only (1+esc)^t for t = 0..n-1, built as a running product
+    """
+    factors = np.full(n, 1.0 + esc)
+    factors[0] = 1.0
+    np.cumprod(factors, out=factors)
+    factors.setflags(write=False)
+    return factors
+
+
+def _cashflow_core_numpy(
+    factors: np.ndarray, base: float, gen: float, om: float, cf0: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (prices, net, cum) for years 1..n given escalation factors from _price_factors;
+    cum includes year 0
+    """
+    n = len(factors)
+    prices = base * factors
+    net = gen * prices - om
+    cum = np.empty(n + 1)
+    cum[0] = cf0
+    np.cumsum(net, out=cum[1:])
+    cum[1:] += cf0
+    return prices, net, cum
+
+
+def _cashflow_core_loop(
+    factors: np.ndarray, base: float, gen: float, om: float, cf0: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scalar-loop version of _cashflow_core_numpy, compiled with numba when available
+    """
+    n = len(factors)
+    prices = np.empty(n)
+    net = np.empty(n)
+    cum = np.empty(n + 1)
+    cum[0] = cf0
+    for i in range(n):
+        prices[i] = base * factors[i]
+        net[i] = gen * prices[i] - om
+        cum[i + 1] = cum[i] + net[i]
+    return prices, net, cum
+
+
+if njit is not None:
+    _cashflow_core = njit(cache=True)(_cashflow_core_loop)
+    _cashflow_core(_price_factors(1, 0.0), 1.0, 1.0, 0.0, 0.0)  # compile on import
+else:
+    _cashflow_core = _cashflow_core_numpy
+
+
 def build_cashflow_schedule(
     system_size_kw: float,
     base_price_per_kwh: float,
@@ -96,99 +180,202 @@ def build_cashflow_schedule(
     gen_kwh_per_kw_year: float = GEN_KWH_PER_KW_YEAR,
     escalation: float = PRICE_ESCALATION,
     om_per_kw_year: float = OM_PER_KW_YEAR,
-) -> Tuple[pd.DataFrame, list[float]]:
+    capex: Optional[float] = None,
+    annual_gen: Optional[float] = None,
+) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
     """
+    capex / annual_gen may be passed if already computed by the caller
+
     Returns:
       - cashflow_table: DataFrame with rows 
-      - cashflows: list of cash flow value for IRR calculation
+      - cashflows: array of cash flow values for IRR calculation
+      - cumulative: array of cumulative cash flow values
+      - years: array of year numbers (0..years)
     """
     if years <= 0:
         raise ValueError("years must be > 0.")
     if base_price_per_kwh <= 0:
         raise ValueError("base_price_per_kwh must be > 0.")
 
-    capex = calc_upfront_capex(system_size_kw, capex_per_watt)
+    if capex is None:
+        capex = calc_upfront_capex(system_size_kw, capex_per_watt)
     itc = calc_itc_value(capex, itc_rate)
-    annual_gen = calc_annual_generation_kwh(system_size_kw, gen_kwh_per_kw_year)
+    if annual_gen is None:
+        annual_gen = calc_annual_generation_kwh(system_size_kw, gen_kwh_per_kw_year)
     om = annual_om_cost(system_size_kw, om_per_kw_year)
 
-    rows: list[Dict[str, Any]] = []
-    cashflows: list[float] = []
-
-    cumulative = 0.0
+    if escalation < 0:
+        raise ValueError("escalation must be >= 0.")
 
     # Year 0
     cf0 = -capex + itc
-    cumulative += cf0
-    rows.append({
-        "year": 0,
-        "price_per_kwh": None,
-        "generation_kwh": 0.0,
-        "om_cost": 0.0,
-        "net_cashflow": cf0,
-        "cumulative_cashflow": cumulative,
-    })
-    cashflows.append(cf0)
 
     # Years 1+
-    for yr in range(1, years + 1):
-        price = electricity_price_for_year(base_price_per_kwh, yr, escalation)
-        gross_savings = annual_gen * price
-        net_cf = gross_savings - om
-        cumulative += net_cf
-
-        rows.append({
-            "year": yr,
-            "price_per_kwh": price,
-            "generation_kwh": annual_gen,
-            "om_cost": om,
-            "net_cashflow": net_cf,
-            "cumulative_cashflow": cumulative,
-        })
-        cashflows.append(net_cf)
+    prices, net, cum_full = _cashflow_core(
+        _price_factors(int(years), float(escalation)),
+        float(base_price_per_kwh), float(annual_gen), float(om), float(cf0),
+    )
 
-    table = pd.DataFrame(rows)
-    return table, cashflows
+    # Typed columns so pandas/Arrow skip dtype inference; year 0 price is NaN, not None
+    year_full = np.arange(years + 1, dtype=np.int32)
+    price_full = np.empty(years + 1, dtype=np.float64)
+    price_full[0] = np.nan
+    price_full[1:] = prices
+    gen_full = np.full(years + 1, annual_gen, dtype=np.float64)
+    gen_full[0] = 0.0
+    om_full = np.full(years + 1, om, dtype=np.float64)
+    om_full[0] = 0.0
+    net_full = np.empty(years + 1, dtype=np.float64)
+    net_full[0] = cf0
+    net_full[1:] = net
+
+    table = pd.DataFrame({
+        "year": year_full,
+        "price_per_kwh": price_full,
+        "generation_kwh": gen_full,
+        "om_cost": om_full,
+        "net_cashflow": net_full,
+        "cumulative_cashflow": cum_full,
+    })
+    return table, net_full, cum_full, year_full
 
 
-def calc_project_irr(cashflows: list[float]) -> Optional[float]:
+def _horner(coefs: list[float], x: float) -> Tuple[float, float]:
     """
-    Returns IRR as a decimal 
+    Returns (p(x), p'(x)) for a polynomial with coefficients highest power first
+    """
+    p = 0.0
+    dp = 0.0
+    for c in coefs:
+        dp = dp * x + p
+        p = p * x + c
+    return p, dp
+
+
+def _irr_newton(
+    cf: list[float],
+    guess: float = 0.1,
+    tol: float = 1e-12,
+    maxiter: int = 50,
+) -> Tuple[float, bool]:
+    """
+    Newton-Raphson solve of NPV(r) = sum(cf_t * x^t) = 0 with x = 1/(1+r),
+    evaluated with Horner's scheme
+    Steps that would cross r = -1 are clamped halfway toward -1
+    Returns (last finite rate, converged)
+    """
+    coefs = cf[::-1]
+    abs_coefs = [abs(c) for c in coefs]
+    r = guess
+
+    for _ in range(maxiter):
+        x = 1.0 / (1.0 + r)
+        npv, dnpv_dx = _horner(coefs, x)
+        dnpv = -dnpv_dx * x * x
+        if dnpv == 0 or not (math.isfinite(npv) and math.isfinite(dnpv)):
+            break
+        r_next = r - npv / dnpv
+        if not math.isfinite(r_next):
+            break
+        if r_next <= -1.0:
+            r_next = (r - 1.0) / 2
+        if abs(r_next - r) <= tol * (1.0 + abs(r)):
+            x = 1.0 / (1.0 + r_next)
+            npv = _horner(coefs, x)[0]
+            scale = _horner(abs_coefs, x)[0]
+            return r_next, abs(npv) <= 1e-8 * scale
+        r = r_next
+
+    return r, False
+
+
+def _irr_bisect(
+    cf: list[float],
+    guess: float = 0.1,
+    tol: float = 1e-12,
+    maxiter: int = 200,
+) -> Optional[float]:
+    """
+    Bisection on q(y) = NPV * y^N with y = 1+r, which has the sign of the NPV
+    and stays finite as r -> -1
+    The bracket is grown outward from guess, toward r -> -1 and r -> inf,
+    while q stays finite and its sign is unchanged
+    Returns None if no sign change is found
     """
-    if not cashflows or len(cashflows) < 2:
+    def q(y: float) -> float:
+        return _horner(cf, y)[0]
+
+    y0 = 1.0 + guess if math.isfinite(guess) and guess > -1.0 else 1.1
+    q0 = q(y0)
+    if not math.isfinite(q0):
+        y0 = 1.1
+        q0 = q(y0)
+    if q0 == 0:
+        return y0 - 1.0
+
+    bracket = None
+    lo, hi = y0, y0
+    while bracket is None and (lo > 1e-12 or hi < 1e6):
+        if lo > 1e-12:
+            q_lo = q(lo / 2)
+            if math.isfinite(q_lo) and (q_lo > 0) != (q0 > 0):
+                bracket = (lo / 2, lo)
+            lo /= 2
+        if bracket is None and hi < 1e6:
+            q_hi = q(hi * 2)
+            if not math.isfinite(q_hi):
+                hi = math.inf
+            elif (q_hi > 0) != (q0 > 0):
+                bracket = (hi, hi * 2)
+            else:
+                hi *= 2
+
+    if bracket is None:
         return None
 
-    irr = npf.irr(cashflows)
+    a, b = bracket
+    q_a = q(a)
+    for _ in range(maxiter):
+        mid = 0.5 * (a + b)
+        q_mid = q(mid)
+        if q_mid == 0 or b - a <= tol * b:
+            return mid - 1.0
+        if (q_mid > 0) == (q_a > 0):
+            a, q_a = mid, q_mid
+        else:
+            b = mid
 
-    try:
-        irr = float(irr)
-    except Exception:
+    return 0.5 * (a + b) - 1.0
+
+
+def calc_project_irr(cashflows: np.ndarray | list[float]) -> Optional[float]:
+    """
+    Returns IRR as a decimal 
+    """
+    if cashflows is None or len(cashflows) < 2:
         return None
 
-    if irr != irr:  # NaN check
+    cf = np.asarray(cashflows, dtype=np.float64).tolist()
+    irr, converged = _irr_newton(cf)
+    if not converged:
+        irr = _irr_bisect(cf, irr)
+
+    if irr is None or irr != irr:  # NaN check
         return None
 
-    return irr
+    return float(irr)
 
 
-def calc_payback_period_years(cashflow_table: pd.DataFrame) -> Optional[int]:
+def calc_payback_period_years(cum: np.ndarray, years_arr: np.ndarray) -> Optional[int]:
     """
     Returns the first year where cumulative cash flow >= 0
     Returns None if never pays back within the horizon.
     """
+    mask = cum >= 0
+    if not mask.any():
+        return None
 
-    cum = cashflow_table["cumulative_cashflow"].tolist()
-    yrs = cashflow_table["year"].tolist()
-
-    if cum[0] >= 0:
-        return int(yrs[0])
-
-    # Find first non-negative cumulative cashflow
-    for i in range(1, len(cum)):
-        if cum[i] >= 0:
-            return int(yrs[i])
-
-    return None
+    return int(years_arr[mask.argmax()])
 
 
 # Function for frontend  
@@ -210,20 +397,22 @@ def run_solar_model(
     upfront = calc_upfront_capex(system_size_kw)
     annual_gen = calc_annual_generation_kwh(system_size_kw)
 
-    table, cashflows = build_cashflow_schedule(
+    table, cashflows, cumulative, year_arr = build_cashflow_schedule(
         system_size_kw=system_size_kw,
         base_price_per_kwh=base_price,
         years=years,
+        capex=upfront,
+        annual_gen=annual_gen,
     )
 
     irr = calc_project_irr(cashflows)
-    payback = calc_payback_period_years(table)
-
-    display_table = table.copy()
+    payback = calc_payback_period_years(cumulative, year_arr)
 
-    display_table["price_per_kwh"] = display_table["price_per_kwh"].round(4)
-    display_table["net_cashflow"] = display_table["net_cashflow"].round(2)
-    display_table["cumulative_cashflow"] = display_table["cumulative_cashflow"].round(2)
+    display_table = table.round({
+        "price_per_kwh": 4,
+        "net_cashflow": 2,
+        "cumulative_cashflow": 2,
+    })
 
     return {
         "cashflow_table": display_table,
@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pytest
+
+import cfModel
+
+
+@pytest.fixture(autouse=True)
+def _repo_cwd(monkeypatch):
+    # cfModel reads energy_prices.csv relative to the working directory
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Reference values from numpy_financial.irr, which the Newton solver replaced
+@pytest.mark.parametrize("cashflows, expected", [
+    ([-100, 60, 60], 0.1306623862918075),
+    ([-100, 5], -0.95),
+    ([-6125, 770.21, 790.78], -0.5723516546548357),
+    ([-100, 1], -0.99),
+    ([-100, 0.5, 0.5], -0.9267451415095754),
+    ([-100] + [1.0] * 60, -0.01544514669212338),
+])
+def test_calc_project_irr_matches_npf(cashflows, expected):
+    assert cfModel.calc_project_irr(cashflows) == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize("cashflows", [[-100, -5, -5], [100, 5], [-100, 0, 0], [-100]])
+def test_calc_project_irr_no_root(cashflows):
+    assert cfModel.calc_project_irr(cashflows) is None
+
+
+@pytest.mark.parametrize("state, years, kw, expected", [
+    ("California", 25, 10.0, 0.2862664867369695),
+    ("Alabama", 5, 3.5, -0.12113792959748759),
+    ("Alabama", 1, 10.0, -0.8742514285714286),
+    ("Texas", 3, 0.1, -0.36616428057275097),
+])
+def test_run_solar_model_irr(state, years, kw, expected):
+    irr = cfModel.run_solar_model(state, kw, years)["irr"]
+    assert irr == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize("cum, expected", [
+    ([5.0, 10.0, 15.0], 0),
+    ([-10.0, -4.0, 0.0, 6.0], 2),
+    ([-10.0, -8.0, -6.0], None),
+])
+def test_calc_payback_period_years(cum, expected):
+    years_arr = np.arange(len(cum), dtype=np.int32)
+    assert cfModel.calc_payback_period_years(np.array(cum), years_arr) == expected
+
+
+def test_calc_project_irr_sweep_against_npf():
+    npf = pytest.importorskip("numpy_financial")
+    for state in cfModel.get_states():
+        price = cfModel.get_electricity_price(state)
+        for years in range(1, cfModel.PROJECT_YEARS + 1):
+            for kw in (0.1, 10.0, 1000.0):
+                _, cf, _, _ = cfModel.build_cashflow_schedule(kw, price, years)
+                assert cfModel.calc_project_irr(cf) == pytest.approx(npf.irr(cf), abs=1e-8)
+
+
+def test_calc_project_irr_long_horizon_near_breakeven():
+    # Low prices give IRRs near zero; horizons past ~51 years used to fail
+    npf = pytest.importorskip("numpy_financial")
+    for price in np.linspace(0.011, 0.05, 8):
+        for years in range(1, 101):
+            _, cf, _, _ = cfModel.build_cashflow_schedule(10.0, price, years)
+            expected = npf.irr(cf)
+            got = cfModel.calc_project_irr(cf)
+            if np.isnan(expected):
+                assert got is None
+            else:
+                assert got == pytest.approx(expected, abs=1e-8)
+
+def _write_prices(tmp_path, monkeypatch, text):
+    (tmp_path / "energy_prices.csv").write_text(text)
+    monkeypatch.chdir(tmp_path)
+    cfModel._load_prices.cache_clear()
+
+
+@pytest.fixture
+def _fresh_prices():
+    cfModel._load_prices.cache_clear()
+    yield
+    cfModel._load_prices.cache_clear()
+
+
+def test_duplicate_state_uses_first_row(tmp_path, monkeypatch, _fresh_prices):
+    _write_prices(tmp_path, monkeypatch, "state,cost_per_kWh\nOhio,0.10\nohio,0.20\n")
+    assert cfModel.get_electricity_price("Ohio") == 0.10
+
+
+@pytest.mark.parametrize("n, esc", [(1, 0.0), (25, 0.025), (25, 0.0), (40, 0.1)])
+def test_cashflow_kernels_agree(n, esc):
+    args = (cfModel._price_factors(n, esc), 0.3, 14000.0, 150.0, -17500.0)
+    expected = cfModel._cashflow_core_numpy(*args)
+    for kernel in (cfModel._cashflow_core_loop, cfModel._cashflow_core):
+        for got, want in zip(kernel(*args), expected):
+            np.testing.assert_allclose(got, want, rtol=1e-12, atol=1e-9)
+
+
+def test_blank_state_row_is_skipped(tmp_path, monkeypatch, _fresh_prices):
+    _write_prices(tmp_path, monkeypatch, "state,cost_per_kWh\nOhio,0.10\n,0.30\nUtah,0.12\n")
+    assert cfModel.get_states() == ["Ohio", "Utah"]
+    assert cfModel.get_electricity_price("utah") == 0.12